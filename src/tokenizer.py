@@ -1,16 +1,70 @@
 import os
+from array import array
 from collections import Counter
-from sys import prefix
+from itertools import accumulate
+from operator import itemgetter
 from typing import List, Union, Iterable
 
+np = None  # NumPy is optional and only imported by _load_numpy(), so importing this module doesn't pay for it.
+_np_checked = False
+
+# Measured crossovers against the pure-Python paths (40-char alphabet): the encode gather wins from ~200 chars, and
+# the decode gather wins from ~150 ids but only for ndarray input -- converting a list of Python ints costs as much
+# as the whole Python decode, so lists never take the NumPy path.
+_NP_ENCODE_MIN_LEN = 256
+_NP_DECODE_MIN_LEN = 256
+_ORD_SPECIAL = 0xFFFFFFFF  # _id2ord sentinels for ids that aren't one character; both lie above the last codepoint.
+_ORD_MULTI = 0xFFFFFFFE
+_DECODE_BLOCK = 1 << 14  # Ids per decode_batch gather; keeps each block's arrays cache-resident.
+_RETURN_TYPES = ('list', 'array', 'numpy')  # Output containers encode() can produce.
+_PRETTY_MAX_VOCAB = 1024  # save() only indents the JSON for vocabs smaller than this.
+_CHUNK_SIZE = 1 << 20  # Characters counted per step in fit, so large corpora never sit in memory whole.
+
+
+def _count_file(path: str, counts: Counter) -> None:  # Stream a file into counts one chunk at a time.
+    with open(path, 'r', encoding='utf-8') as f:
+        while True:
+            chunk = f.read(_CHUNK_SIZE)
+            if not chunk:
+                break
+            counts.update(chunk)
+
+
+def _load_numpy() -> None:  # Import NumPy on the first fit/load; without it encode/decode stay on the pure-Python paths.
+    global np, _np_checked
+    if _np_checked:
+        return
+    _np_checked = True
+    try:
+        import numpy
+    except ImportError:
+        return
+    np = numpy
+
+
+class _UnkTable(dict):  # stoi copy whose misses fall back to <UNK>, so encode can map() straight over __getitem__.
+    def __init__(self, stoi, unk_id):
+        super().__init__(stoi)
+        self.unk_id = unk_id
+
+    def __missing__(self, key):
+        return self.unk_id
+
 # Class for tokenizer. Mind many of these comments are for my own tracking purposes.
 class CharTokenizer:
     def __init__(self):  # Initialize the tokenizer with empty vocabularies to standardize creation.
         self.stoi = {}
-        self.itos = {}
+        self.itos = []  # Indexed by id; ids are always dense 0..vocab_size-1.
         self.pad_id = None  # pad_id and unk_id will be set when building the vocab. This is to prevent using unfitted vocabs.
         self.unk_id = None
         self.vocab_size = 0
+        self._char_counts = None  # Character counts from the last fit(), kept so refit() can skip re-reading the corpus.
+        self._strict_get = None  # Bound lookups used by encode, chosen once by _build_tables() after fit/load.
+        self._lenient_get = None
+        self._ord2id = None  # NumPy tables (only when NumPy is installed): ord -> id, id -> ord, and id masks.
+        self._id2ord = None
+        self._is_special = None
+        self._is_char = None
 
     def is_fitted(self) -> bool:  # Quick check to see if the tokenizer is fitted.
         return bool(self.stoi) and bool(self.itos)
@@ -19,32 +73,46 @@ class CharTokenizer:
         if self.is_fitted():  # Simple checks to prevent refitting.
             raise ValueError("Tokenizer is already fitted. Please create a new instance to fit again.")
         # Checks for file path, raw text, or list of file paths.
-        if isinstance(texts_or_paths, str) and os.path.isfile(texts_or_paths):
-            with open(texts_or_paths, 'r', encoding='utf-8') as f:
-                corpus = f.read()
-        elif isinstance(texts_or_paths, str) and not os.path.isfile(texts_or_paths):
-            corpus = texts_or_paths
+        # I originally intended to make a manual loop through the corpus, but apparently Counter is already made for that.
+        counts = Counter()
+        is_str = isinstance(texts_or_paths, str)
+        is_file = is_str and os.path.isfile(texts_or_paths)  # Only one stat() per fit for the string case.
+        if is_file:
+            _count_file(texts_or_paths, counts)
+        elif is_str:
+            for start in range(0, len(texts_or_paths), _CHUNK_SIZE):
+                counts.update(texts_or_paths[start:start + _CHUNK_SIZE])
         elif isinstance(texts_or_paths, (list, tuple)):
-            parts = []
             for p in texts_or_paths:
                 if not isinstance(p, str) or not os.path.isfile(p):
                     raise ValueError(f"Expected file path string, got: {p!r}")
-                with open(p, 'r', encoding='utf-8') as f:
-                    parts.append(f.read())
-            if not parts:
+            if not texts_or_paths:
                 raise ValueError("No files provided to build a corpus.")
-            corpus = '\n'.join(parts)
+            for p in texts_or_paths:
+                _count_file(p, counts)
+            # Files used to be joined with '\n'; count those separators so the vocab comes out the same.
+            if len(texts_or_paths) > 1:
+                counts['\n'] += len(texts_or_paths) - 1
         else:
             raise ValueError("Input should be a string (text or file path) or a list/tuple of file paths.")
 
-        # I originally intended to make a manual loop through the corpus, but apparently Counter is already made for that.
-        counts = Counter(corpus)
+        self._char_counts = counts
+        self._build_vocab_from_counts(counts, include_specials, min_freq)
+
+    def refit(self, include_specials: bool = True, min_freq: int = 1) -> None:  # Rebuild the vocab from the cached counts of the last fit().
+        if self._char_counts is None:
+            raise RuntimeError("No cached character counts. Call fit(...) first.")
+        self._build_vocab_from_counts(self._char_counts, include_specials, min_freq)
+
+    def _build_vocab_from_counts(self, counts: Counter, include_specials: bool, min_freq: int) -> None:
         items = [(ch, c) for ch, c in counts.items() if c >= min_freq]
         if not items and not include_specials:
             raise ValueError("No characters meet the frequency threshold; cannot build vocab.")
 
-        # Sort by frequency (descending) and then alphabetically.
-        items.sort(key=lambda x: (-x[1], x[0]))
+        # Sort by frequency (descending) and then alphabetically. Two stable sorts on C-level itemgetter keys
+        # give the same order as a (-count, char) lambda key without a Python call per item.
+        items.sort(key=itemgetter(0))
+        items.sort(key=itemgetter(1), reverse=True)
         idx = 0
         # Add special tokens first if specified, then add the rest of the characters.
         self.stoi = {}
@@ -58,43 +126,202 @@ class CharTokenizer:
             self.stoi["<UNK>"] = idx
             self.unk_id = idx
             idx += 1
-        for ch, _ in items:
-            if ch not in self.stoi:
-                self.stoi[ch] = idx
-                idx += 1
-        self.itos = {i: s for s, i in self.stoi.items()}
+        # Counter keys are single characters and the specials are multi-char, so nothing here can collide.
+        self.stoi.update((ch, i) for i, (ch, _) in enumerate(items, idx))
+        idx += len(items)
         self.vocab_size = len(self.stoi)
+        self.itos = [None] * self.vocab_size
+        for s, i in self.stoi.items():
+            self.itos[i] = s
 
         #Optional internal sanity check (helps catch accidental mapping bugs early)
-        if not self.stoi or not self.itos or any(self.itos[self.stoi[s]] != s for s in self.stoi):
+        # itos is the inverse by construction; the only possible bug is two chars sharing an id, which would leave
+        # fewer stoi entries than ids handed out, so comparing the counts is enough.
+        if not self.stoi or idx != self.vocab_size:
             raise ValueError("Internal mapping inconsistency after fit().")
-    
-    def encode(self, text: str, strict: bool = False) -> List[int]: # Encode text to list of token IDs in stoi.
+        self._build_tables()
+
+    def _build_tables(self) -> None:  # Precompute encode lookups once so the per-char work stays in C.
+        # Decide here, not per encode() call, whether unknowns fall back to <UNK> or raise KeyError.
+        self._strict_get = self.stoi.__getitem__
+        if self.unk_id is None:
+            self._lenient_get = self._strict_get
+        else:
+            self._lenient_get = _UnkTable(self.stoi, self.unk_id).__getitem__
+        _load_numpy()
+        if np is None:
+            return
+        chars = [(ord(s), i) for s, i in self.stoi.items() if len(s) == 1]
+        max_ord = max((o for o, _ in chars), default=0)
+        # One spare slot past max(max_ord, 127) acts as the "unknown" sentinel for out-of-range codepoints,
+        # and keeps every ASCII byte a valid index for the fast path in _encode_np.
+        self._ord2id = np.full(max(max_ord, 127) + 2, -1, dtype=np.int32)
+        self._id2ord = np.full(self.vocab_size, _ORD_MULTI, dtype='<u4')
+        self._is_char = np.zeros(self.vocab_size, dtype=bool)
+        for o, i in chars:
+            self._ord2id[o] = i
+            self._id2ord[i] = o
+            self._is_char[i] = True
+        self._is_special = np.zeros(self.vocab_size, dtype=bool)
+        for i in (self.pad_id, self.unk_id):
+            if i is not None:
+                self._is_special[i] = True
+                self._id2ord[i] = _ORD_SPECIAL
+
+    def _encode_np(self, text: str, strict: bool):  # Single NumPy gather over the text's codepoints.
+        if text.isascii():
+            codes = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+        else:
+            codes = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype='<u4')
+            codes = np.minimum(codes, len(self._ord2id) - 1)
+        ids = self._ord2id[codes]
+        missing = ids < 0
+        if missing.any():
+            if strict or self.unk_id is None:
+                raise KeyError(text[int(missing.argmax())])
+            ids[missing] = self.unk_id
+        return ids
+
+    def _decode_np(self, token_ids, skip_specials: bool):  # Returns None when the ids can't take the gather path.
+        ids = np.asarray(token_ids)
+        if ids.ndim != 1 or ids.dtype.kind not in 'iu':
+            return None
+        bad = (ids < 0) | (ids >= self.vocab_size)
+        if bad.any():
+            raise KeyError(ids[bad.argmax()].item())
+        if skip_specials and self.pad_id is not None and self.unk_id is not None:
+            ids = ids[~self._is_special[ids]]
+        if not self._is_char[ids].all():
+            return None
+        return self._id2ord[ids].tobytes().decode('utf-32-le', 'surrogatepass')
+
+    def encode(self, text: str, strict: bool = False, return_type: str = 'list') -> Union[List[int], "array", "np.ndarray"]: # Encode text to token IDs in stoi.
+        # return_type 'array' gives array.array('i') and 'numpy' gives an int32 ndarray; both keep ids as 4-byte ints instead of boxed Python ints.
         if not self.is_fitted():
             raise RuntimeError("Tokenizer not fitted. Call fit(...) first.")
-        if strict:
-            return [self.stoi[ch] for ch in text]  # will raise KeyError automatically
-        if self.unk_id is None:
-            return [self.stoi[ch] for ch in text]  # will also raise KeyError on unknown
-        return [self.stoi.get(ch, self.unk_id) for ch in text]
+        if return_type not in _RETURN_TYPES:
+            raise ValueError(f"return_type must be one of {_RETURN_TYPES}, got: {return_type!r}")
+        if np is not None and (return_type == 'numpy' or len(text) >= _NP_ENCODE_MIN_LEN):
+            ids = self._encode_np(text, strict)
+            if return_type == 'numpy':
+                return ids
+            if return_type == 'array':
+                return array('i', ids.astype(np.intc, copy=False).tobytes())
+            return ids.tolist()
+        if return_type == 'numpy':
+            raise ImportError("return_type='numpy' requires NumPy to be installed.")
+        # _strict_get raises KeyError on unknown; _lenient_get sends misses through _UnkTable.__missing__.
+        ids = map(self._strict_get if strict else self._lenient_get, text)
+        return array('i', ids) if return_type == 'array' else list(ids)
 
-    def decode(self, token_ids: List[int], skip_specials: bool = True) -> str:  # Decode list of token IDs back to text using itos.
+    def encode_batch(self, texts: Iterable[str], strict: bool = False, return_type: str = 'list') -> list:  # Encode many texts with one gather instead of one encode() call each.
         if not self.is_fitted():
             raise RuntimeError("Tokenizer not fitted. Call fit(...) first.")
-        if skip_specials and self.pad_id is not None and self.unk_id is not None:
-            return ''.join(self.itos[i] for i in token_ids if i != self.pad_id and i != self.unk_id)
-        return ''.join(self.itos[i] for i in token_ids)
+        if return_type not in _RETURN_TYPES:
+            raise ValueError(f"return_type must be one of {_RETURN_TYPES}, got: {return_type!r}")
+        texts = list(texts)
+        if np is None:
+            return [self.encode(text, strict, return_type) for text in texts]
+        ids = self._encode_np(''.join(texts), strict)
+        ends = list(accumulate(map(len, texts)))
+        rows = [ids[start:end] for start, end in zip([0] + ends[:-1], ends)]  # Views into the one gathered array.
+        # Convert per row rather than converting the flat array and slicing it, which would copy every id twice.
+        if return_type == 'list':
+            return [row.tolist() for row in rows]
+        if return_type == 'array':
+            return [array('i', row.astype(np.intc, copy=False).tobytes()) for row in rows]
+        return rows
 
-    def get_vocab_size(self) -> int:  # Return the size of the vocabulary.
+    def decode(self, token_ids: Iterable[int], skip_specials: bool = True) -> str:  # Decode token IDs (any iterable) back to text using itos.
         if not self.is_fitted():
             raise RuntimeError("Tokenizer not fitted. Call fit(...) first.")
-        return self.vocab_size
+        if not hasattr(token_ids, '__len__'):  # Generators/map objects: materialize so the error path can rescan them.
+            token_ids = list(token_ids)
+        if np is not None and isinstance(token_ids, np.ndarray) and len(token_ids) >= _NP_DECODE_MIN_LEN:
+            text = self._decode_np(token_ids, skip_specials)
+            if text is not None:
+                return text
+        itos = self.itos  # Local avoids an attribute lookup per id.
+        # itos is a list, so negative ids would silently index from the end; they become None instead, which makes
+        # join() fail in the same pass as an out-of-range id would.
+        try:
+            if skip_specials and self.pad_id is not None and self.unk_id is not None:
+                pad, unk = self.pad_id, self.unk_id
+                return ''.join([itos[i] if i >= 0 else None for i in token_ids if i != pad and i != unk])
+            return ''.join([itos[i] if i >= 0 else None for i in token_ids])
+        except (IndexError, TypeError):
+            # Error path only: name the offending id, like the old dict-based itos did.
+            for i in token_ids:
+                try:
+                    valid = 0 <= i < self.vocab_size
+                except TypeError:
+                    valid = False
+                if not valid:
+                    raise KeyError(i) from None
+            raise
+
+    def decode_batch(self, batch: Iterable[List[int]], skip_specials: bool = True) -> List[str]:  # Decode many id sequences with one mask + gather per block.
+        if not self.is_fitted():
+            raise RuntimeError("Tokenizer not fitted. Call fit(...) first.")
+        rows = list(batch)
+        if np is None or not rows:
+            return [self.decode(row, skip_specials) for row in rows]
+        arrays = [np.asarray(row) for row in rows]  # No dtype cast: int32 rows from encode() stay uncopied.
+        # Empty rows come out as float64 from np.asarray([]), so only non-empty rows need an integer dtype.
+        if any(a.ndim != 1 or (a.size and a.dtype.kind not in 'iu') for a in arrays):
+            return [self.decode(row, skip_specials) for row in rows]  # Same errors as decode() for non-integer ids.
+        # Consecutive rows are grouped into blocks of about _DECODE_BLOCK ids: small rows still share one gather,
+        # while long rows aren't glued into one huge array that falls out of cache.
+        out = []
+        start = size = 0
+        for end, a in enumerate(arrays, 1):
+            size += len(a)
+            if size >= _DECODE_BLOCK or end == len(arrays):
+                texts = self._decode_rows_np(arrays[start:end], skip_specials)
+                if texts is None:
+                    texts = [self.decode(row, skip_specials) for row in rows[start:end]]
+                out.extend(texts)
+                start, size = end, 0
+        return out
+
+    def _decode_rows_np(self, arrays, skip_specials: bool):  # One block of decode_batch; None when it can't take the gather path.
+        nonempty = [a for a in arrays if a.size]
+        flat = np.concatenate(nonempty) if nonempty else np.zeros(0, dtype=np.int64)
+        if flat.dtype.kind not in 'iu':  # e.g. uint64 mixed with int64 promotes to float64.
+            return None
+        if flat.size and (flat.min() < 0 or flat.max() >= self.vocab_size):
+            raise KeyError(flat[(flat < 0) | (flat >= self.vocab_size)][0].item())
+        # One gather for everything: specials and multi-char ids come back as sentinels above the last codepoint,
+        # so the filtering and checks below are cheap compares on the gathered ords instead of more id lookups.
+        ords = self._id2ord.take(flat)  # take() handles int32 ids from encode() without an intp conversion pass.
+        bounds = [0, *accumulate(map(len, arrays))]
+        if skip_specials and self.pad_id is not None and self.unk_id is not None:
+            dropped = np.flatnonzero(ords == _ORD_SPECIAL)
+            if dropped.size:
+                ords = np.delete(ords, dropped)
+                # Shift each row boundary left by the number of specials dropped before it.
+                bounds = (np.asarray(bounds) - np.searchsorted(dropped, bounds)).tolist()
+        if (ords > 0x10FFFF).any():  # Kept specials decode to multi-char strings, which the gather can't produce.
+            return None
+        # Every id is exactly one codepoint here, so the row boundaries index the decoded string directly.
+        text = ords.tobytes().decode('utf-32-le', 'surrogatepass')
+        return [text[start:end] for start, end in zip(bounds, bounds[1:])]
+
+    def get_vocab_size(self) -> int:  # Return the size of the vocabulary (0 until fitted/loaded).
+        return self.vocab_size  # Set once whenever stoi is (re)built, so no recount or fitted check is needed here.
 
     def save(self, path: str) -> None:
         """
         Serialize the tokenizer to a JSON file at `path`.
         Writes atomically (via a temp file + replace) to avoid partial files.
         """
+        import json  # Imported here so training-only code never pays for them at module import.
+        import tempfile
+        try:  # orjson is optional (and imports json itself), so it is only looked up here too.
+            import orjson
+        except ImportError:
+            orjson = None
+
         if not self.is_fitted():
             raise RuntimeError("Tokenizer not fitted. Call fit(...) before save().")
 
@@ -113,8 +340,17 @@ class CharTokenizer:
         # Atomic write: write to a temp file, then replace
         fd, tmp_path = tempfile.mkstemp(dir=parent or None, prefix=".tmp_tok_", suffix=".json")
         try:
-            with os.fdopen(fd, "w", encoding="utf-8") as f:
-                json.dump(payload, f, ensure_ascii=False, indent=2)
+            if orjson is not None:
+                # orjson encodes straight to UTF-8 bytes, so the whole file goes out in one buffered write.
+                option = orjson.OPT_INDENT_2 if self.vocab_size < _PRETTY_MAX_VOCAB else 0
+                with os.fdopen(fd, "wb", buffering=1 << 20) as f:
+                    f.write(orjson.dumps(payload, option=option))
+            else:
+                # json.dump streams its chunks into the buffer; large vocabs skip the indent to halve the output.
+                indent = 2 if self.vocab_size < _PRETTY_MAX_VOCAB else None
+                with os.fdopen(fd, "w", encoding="utf-8", buffering=1 << 20) as f:
+                    json.dump(payload, f, ensure_ascii=False, indent=indent,
+                              separators=None if indent else (",", ":"))
             os.replace(tmp_path, path)
         except Exception:
             # On error, best-effort cleanup
@@ -129,6 +365,8 @@ class CharTokenizer:
         Load tokenizer state from a JSON file into THIS instance.
         Overwrites any existing state on the instance.
         """
+        import json
+
         if not os.path.isfile(path):
             raise FileNotFoundError(f"No such file: {path!r}")
 
@@ -141,17 +379,32 @@ class CharTokenizer:
         if "pad_id" not in data or "unk_id" not in data:
             raise ValueError("Invalid tokenizer file: missing 'pad_id'/'unk_id'.")
 
-        self.stoi = {str(s): int(i) for s, i in data["stoi"].items()}
-        self.pad_id = data["pad_id"] if data["pad_id"] is not None else None
-        self.unk_id = data["unk_id"] if data["unk_id"] is not None else None
+        # json.load already handed us a fresh dict, so validate it in one pass and keep it instead of copying.
+        stoi = data["stoi"]
+        vocab_size = len(stoi)
+        itos = [None] * vocab_size
+        for s, i in stoi.items():
+            if type(i) is not int:  # bool is an int subclass, so check the exact type.
+                raise ValueError(f"Invalid tokenizer file: id for {s!r} is not an integer.")
+            if not 0 <= i < vocab_size:
+                raise ValueError(f"Loaded tokenizer has out-of-range id {i} for {s!r}.")
+            if itos[i] is not None:  # Sanity: mappings must invert, so no id may be shared.
+                raise ValueError("Loaded tokenizer has inconsistent stoi/itos.")
+            itos[i] = s
+        for key in ("pad_id", "unk_id"):
+            special_id = data[key]
+            if special_id is not None and (type(special_id) is not int or not 0 <= special_id < vocab_size):
+                raise ValueError(f"Invalid tokenizer file: {key} must be null or an id in the vocab, got: {special_id!r}")
 
-        # Rebuild inverse + size
-        self.itos = {i: s for s, i in self.stoi.items()}
-        self.vocab_size = len(self.stoi)
+        # Everything is validated; only now touch instance state so a bad file can't leave it half-loaded.
+        self.stoi = stoi
+        self.itos = itos
+        self.vocab_size = vocab_size
+        self.pad_id = data["pad_id"]
+        self.unk_id = data["unk_id"]
+        self._char_counts = None  # Counts belong to whatever was fitted before; a loaded vocab has none.
 
-        # Sanity: mappings must invert
-        if any(self.itos[self.stoi[s]] != s for s in self.stoi):
-            raise ValueError("Loaded tokenizer has inconsistent stoi/itos.")
+        self._build_tables()
 
     @classmethod
     def from_file(cls, path: str) -> "CharTokenizer":
@@ -21,3 +21,243 @@ def test_decode_unknown_id_raises():
     bad = [999999]
     with pytest.raises(KeyError):
         tok.decode(bad)
+
+def test_encode_unknown_maps_to_unk_or_raises_when_strict():
+    tok = CharTokenizer()
+    tok.fit("ab", include_specials=True)
+    assert tok.encode("azb") == [tok.stoi["a"], tok.unk_id, tok.stoi["b"]]
+    with pytest.raises(KeyError):
+        tok.encode("azb", strict=True)
+
+def test_long_text_round_trip_matches_python_path():
+    tok = CharTokenizer()
+    tok.fit("héllo wörld 🙂\n", include_specials=True)
+    text = "héllo wörld 🙂 xyz\n" * 20
+    ids = tok.encode(text)
+    assert ids == [tok.stoi.get(ch, tok.unk_id) for ch in text]
+    assert tok.decode(ids) == text.replace("x", "").replace("y", "").replace("z", "")
+    with pytest.raises(KeyError):
+        tok.encode(text, strict=True)
+    with pytest.raises(KeyError):
+        tok.decode(ids + [999999])
+    assert tok.decode(ids, skip_specials=False).count("<UNK>") == 60
+    np = pytest.importorskip("numpy")
+    arr = np.asarray(ids)
+    assert tok.decode(arr) == tok.decode(ids)
+    assert tok.decode(arr, skip_specials=False) == tok.decode(ids, skip_specials=False)
+    with pytest.raises(KeyError):
+        tok.decode(np.append(arr, 999999))
+
+def test_numpy_paths_only_used_above_measured_thresholds(monkeypatch):
+    np = pytest.importorskip("numpy")
+    import src.tokenizer as tokenizer_module
+    tok = CharTokenizer()
+    tok.fit("ab", include_specials=True)
+    calls = []
+    monkeypatch.setattr(tok, "_encode_np", lambda text, strict: calls.append("enc") or np.zeros(len(text), np.int32))
+    monkeypatch.setattr(tok, "_decode_np", lambda ids, skip: calls.append("dec") or "")
+    tok.encode("ab" * (tokenizer_module._NP_ENCODE_MIN_LEN // 2 - 1))
+    tok.decode([2] * 4 * tokenizer_module._NP_DECODE_MIN_LEN)  # lists never take the gather path
+    tok.decode(np.full(tokenizer_module._NP_DECODE_MIN_LEN - 1, 2))
+    assert calls == []
+    tok.encode("a" * tokenizer_module._NP_ENCODE_MIN_LEN)
+    tok.decode(np.full(tokenizer_module._NP_DECODE_MIN_LEN, 2))
+    assert calls == ["enc", "dec"]
+
+def test_fit_from_file_matches_fit_from_text(tmp_path):
+    text = "the quick brown fox\njumps over the lazy dog\n" * 3
+    path = tmp_path / "corpus.txt"
+    path.write_text(text, encoding="utf-8")
+    from_file = CharTokenizer()
+    from_file.fit(str(path))
+    from_text = CharTokenizer()
+    from_text.fit(text)
+    assert from_file.stoi == from_text.stoi
+
+def test_refit_reuses_counts_with_new_min_freq():
+    tok = CharTokenizer()
+    tok.fit("aaabbc", include_specials=True)
+    assert tok.get_vocab_size() == 5
+    tok.refit(include_specials=True, min_freq=2)
+    assert set(tok.stoi) == {"<PAD>", "<UNK>", "a", "b"}
+    assert tok.encode("abc") == [tok.stoi["a"], tok.stoi["b"], tok.unk_id]
+
+def test_refit_requires_fit():
+    with pytest.raises(RuntimeError):
+        CharTokenizer().refit()
+
+def test_itos_is_dense_list_and_negative_ids_raise():
+    tok = CharTokenizer()
+    tok.fit("ab", include_specials=True)
+    assert tok.itos == ["<PAD>", "<UNK>", "a", "b"]
+    with pytest.raises(KeyError):
+        tok.decode([tok.stoi["a"], -1])
+
+@pytest.mark.parametrize("text", ["abz", "abz" * 50])
+def test_encode_return_types(text):
+    tok = CharTokenizer()
+    tok.fit("ab", include_specials=True)
+    expected = tok.encode(text)
+    assert list(tok.encode(text, return_type="array")) == expected
+    assert tok.encode(text, return_type="array").typecode == "i"
+    with pytest.raises(ValueError):
+        tok.encode(text, return_type="tensor")
+
+def test_encode_numpy_return_type():
+    np = pytest.importorskip("numpy")
+    tok = CharTokenizer()
+    tok.fit("ab", include_specials=True)
+    ids = tok.encode("abz", return_type="numpy")
+    assert ids.dtype == np.int32
+    assert ids.tolist() == tok.encode("abz")
+
+def test_save_load_round_trip(tmp_path):
+    tok = CharTokenizer()
+    tok.fit("héllo wörld 🙂\n", include_specials=True)
+    path = tmp_path / "nested" / "tok.json"
+    tok.save(str(path))
+    loaded = CharTokenizer.from_file(str(path))
+    assert loaded.stoi == tok.stoi
+    assert loaded.itos == tok.itos
+    assert (loaded.pad_id, loaded.unk_id) == (tok.pad_id, tok.unk_id)
+    assert loaded.encode("héllo?") == tok.encode("héllo?")
+
+@pytest.mark.parametrize("stoi, pad_id, unk_id", [
+    ({"a": 0, "b": 5}, None, None),
+    ({"a": 0, "b": 0}, None, None),
+    ({"a": 0, "b": True}, None, None),
+    ({"a": "0"}, None, None),
+    ({"<PAD>": 0, "a": 1}, 5, None),
+    ({"<PAD>": 0, "a": 1}, "x", None),
+    ({"<PAD>": 0, "a": 1}, 0, -1),
+    ({"<PAD>": 0, "a": 1}, 0, False),
+])
+def test_load_rejects_bad_ids(tmp_path, stoi, pad_id, unk_id):
+    import json
+    good = tmp_path / "good.json"
+    good.write_text(json.dumps({"stoi": {"x": 0}, "pad_id": None, "unk_id": None}), encoding="utf-8")
+    tok = CharTokenizer.from_file(str(good))
+    path = tmp_path / "bad.json"
+    path.write_text(json.dumps({"stoi": stoi, "pad_id": pad_id, "unk_id": unk_id}), encoding="utf-8")
+    with pytest.raises(ValueError):
+        tok.load(str(path))
+    assert tok.stoi == {"x": 0} and tok.itos == ["x"] and tok.pad_id is None  # previous state untouched
+
+@pytest.mark.parametrize("return_type", ["list", "array"])
+def test_encode_batch_matches_encode(return_type):
+    tok = CharTokenizer()
+    tok.fit("hello world", include_specials=True)
+    texts = ["hello", "", "wörld", "x" * 100, "hello wörld" * 2000]
+    batch = tok.encode_batch(texts, return_type=return_type)
+    assert [list(ids) for ids in batch] == [tok.encode(t) for t in texts]
+    with pytest.raises(KeyError):
+        tok.encode_batch(texts, strict=True)
+
+def test_get_vocab_size_is_zero_until_fitted():
+    tok = CharTokenizer()
+    assert tok.get_vocab_size() == 0
+    tok.fit("abc", include_specials=True)
+    assert tok.get_vocab_size() == len(tok.stoi) == 5
+
+def test_fit_multiple_files_counts_separators_like_joined_text(tmp_path):
+    paths = []
+    for name, text in [("a.txt", "aab"), ("b.txt", "bcc"), ("c.txt", "c")]:
+        path = tmp_path / name
+        path.write_text(text, encoding="utf-8")
+        paths.append(str(path))
+    from_files = CharTokenizer()
+    from_files.fit(paths)
+    joined = CharTokenizer()
+    joined.fit("aab\nbcc\nc")
+    assert from_files.stoi == joined.stoi
+    assert from_files._char_counts["\n"] == 2
+
+@pytest.mark.parametrize("skip_specials", [True, False])
+def test_decode_batch_matches_decode(skip_specials):
+    tok = CharTokenizer()
+    tok.fit("hello wörld", include_specials=True)
+    rows = [tok.encode("hello?"), [], [tok.pad_id, tok.pad_id], tok.encode("wörld" * 20)]
+    assert tok.decode_batch(rows, skip_specials=skip_specials) == [tok.decode(r, skip_specials=skip_specials) for r in rows]
+    np = pytest.importorskip("numpy")
+    long_rows = [tok.encode("hello? wörld" * 2000, return_type="numpy") for _ in range(3)]
+    long_rows.insert(1, np.asarray([tok.pad_id] * 5 + tok.encode("hi") + [tok.unk_id], dtype=np.int32))
+    assert tok.decode_batch(long_rows, skip_specials=skip_specials) == [tok.decode(r, skip_specials=skip_specials) for r in long_rows]
+    with pytest.raises(KeyError):
+        tok.decode_batch(rows + [[999999]])
+
+def test_decode_accepts_any_iterable():
+    tok = CharTokenizer()
+    tok.fit("ab", include_specials=True)
+    ids = [tok.pad_id, tok.stoi["a"], tok.stoi["b"]]
+    assert tok.decode(i for i in ids) == "ab"
+    assert tok.decode(map(int, ids), skip_specials=False) == "<PAD>ab"
+    with pytest.raises(KeyError):
+        tok.decode(i for i in [tok.stoi["a"], -2])
+
+@pytest.mark.parametrize("use_orjson", [False, True])
+def test_save_large_vocab_is_compact_and_round_trips(tmp_path, monkeypatch, use_orjson):
+    import sys
+    from src.tokenizer import _PRETTY_MAX_VOCAB
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setitem(sys.modules, "orjson", None)  # makes save()'s import fail, forcing the stdlib json path
+    tok = CharTokenizer()
+    tok.fit("".join(chr(0x4E00 + k) for k in range(_PRETTY_MAX_VOCAB)), include_specials=True)
+    assert tok.get_vocab_size() >= _PRETTY_MAX_VOCAB
+    path = tmp_path / "tok.json"
+    tok.save(str(path))
+    raw = path.read_text(encoding="utf-8")
+    assert "\n" not in raw and '": ' not in raw  # no indent, compact separators
+    loaded = CharTokenizer.from_file(str(path))
+    assert loaded.stoi == tok.stoi
+    assert (loaded.pad_id, loaded.unk_id) == (tok.pad_id, tok.unk_id)
+
+def test_pure_python_fallback_matches_numpy_paths(monkeypatch):
+    pytest.importorskip("numpy")
+    import src.tokenizer as tokenizer_module
+    tok = CharTokenizer()
+    tok.fit("héllo wörld 🙂\n", include_specials=True)
+    texts = ["héllo wörld 🙂 xyz\n" * 20, "", "hello", "wörld?" * 60]
+    long_text = texts[0]
+    rows = [tok.encode(t) for t in texts] + [[tok.pad_id, tok.unk_id]]
+    with_np = (
+        tok.encode(long_text),
+        list(tok.encode(long_text, return_type="array")),
+        tok.encode_batch(texts),
+        [list(ids) for ids in tok.encode_batch(texts, return_type="array")],
+        tok.decode_batch(rows),
+        tok.decode_batch(rows, skip_specials=False),
+    )
+
+    monkeypatch.setattr(tokenizer_module, "np", None)
+    monkeypatch.setattr(tokenizer_module, "_np_checked", True)  # keep _load_numpy from bringing it back
+    without_np = (
+        tok.encode(long_text),
+        list(tok.encode(long_text, return_type="array")),
+        tok.encode_batch(texts),
+        [list(ids) for ids in tok.encode_batch(texts, return_type="array")],
+        tok.decode_batch(rows),
+        tok.decode_batch(rows, skip_specials=False),
+    )
+    assert without_np == with_np
+    with pytest.raises(KeyError):
+        tok.encode(long_text, strict=True)
+    with pytest.raises(ImportError):
+        tok.encode(long_text, return_type="numpy")
+    with pytest.raises(ImportError):
+        tok.encode_batch(texts, return_type="numpy")
+
+    fresh = CharTokenizer()  # fitted while NumPy is "missing": no NumPy tables are built at all
+    fresh.fit("héllo wörld 🙂\n", include_specials=True)
+    assert fresh._ord2id is None
+    assert fresh.encode(long_text) == with_np[0]
+
+def test_decode_batch_rejects_non_integer_ids_like_decode():
+    tok = CharTokenizer()
+    tok.fit("ab", include_specials=True)
+    with pytest.raises(TypeError):
+        tok.decode([2.7, 3])
+    with pytest.raises(TypeError):
+        tok.decode_batch([[2.7, 3]])
+    assert tok.decode_batch([[], [2, 3], []]) == ["", tok.decode([2, 3]), ""]